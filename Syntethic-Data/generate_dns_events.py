@@ -1,20 +1,34 @@
 #!/usr/bin/env python3
+import bisect
 import csv
 import datetime
+import heapq
 import ipaddress
+import itertools
 import json
 import math
 import os
 import random
+import shutil
 import string
+import sys
 import time
-from collections import defaultdict
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
 
 # Configuration parameters
 MAX_EVENTS = 500000  # Maximum number of events to generate
 OUTPUT_FILE = "dns_events.json"
+OUTPUT_FORMAT = "json"  # "json" for Splunk ingestion, "parquet" for columnar analysis
+PARQUET_DATASET_DIR = "dns_events"  # Partitioned Parquet output (requires pyarrow)
+PARQUET_BATCH_SIZE = 10000  # Events converted to Arrow at a time
 TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
 TIME_PERIOD_DAYS = 30  # 1 month of data
+MAX_WORKERS = None  # Processes used for anomaly generation (None = one per CPU)
+# Master seed so repeated runs produce the same dataset; override it with the
+# DNSGUARD_SEED environment variable, where 0 means an unseeded (random) run
+RANDOM_SEED = int(os.environ.get("DNSGUARD_SEED", "42")) or None
 
 # Organization infrastructure simulation
 NUM_INTERNAL_HOSTS = 100  # Realistic number of hosts in a medium-sized organization
@@ -475,6 +489,38 @@ TOP_DOMAINS = [
     "adobedtm.com",
 ]
 
+# Relative query popularity of TOP_DOMAINS (frequent sites are more common)
+DOMAIN_WEIGHTS = [
+    100,
+    90,
+    85,
+    80,
+    75,
+    70,
+    65,
+    60,
+    55,
+    50,
+    45,
+    40,
+    35,
+    30,
+    25,
+    20,
+    15,
+    10,
+    5,
+    5,
+    5,
+    5,
+    5,
+    5,
+]
+
+# Cumulative weights let random.choices skip re-accumulating on every call
+_DOMAIN_CHOICES = TOP_DOMAINS[: len(DOMAIN_WEIGHTS)]
+_DOMAIN_CUM_WEIGHTS = list(itertools.accumulate(DOMAIN_WEIGHTS[: len(TOP_DOMAINS)]))
+
 MALICIOUS_DOMAINS = [
     "evil-c2-server.com",
     "malware-payload.net",
@@ -512,6 +558,46 @@ REPLY_CODES = {
     "REFUSED": 0.001,  # 0.1% query refused
 }
 
+# Weighted-choice tables precomputed once instead of rebuilt for every event;
+# cumulative weights spare random.choices from re-accumulating on each call
+_RECORD_TYPE_KEYS = tuple(RECORD_TYPES)
+_RECORD_TYPE_CUM_WEIGHTS = tuple(itertools.accumulate(RECORD_TYPES.values()))
+_REPLY_CODE_KEYS = tuple(REPLY_CODES)
+_REPLY_CODE_CUM_WEIGHTS = tuple(itertools.accumulate(REPLY_CODES.values()))
+
+# Internal DNS servers - Most companies have 2-3 internal DNS servers
+_DNS_SERVERS = ("10.0.0.1", "10.0.0.2", "10.0.0.3")
+
+# Lookup tables that replace per-event conditionals
+_TRANSPORTS = ("UDP", "TCP")  # Indexed by "is TCP" (5% of queries)
+_VENDOR_PRODUCTS = {"windows": "Microsoft DNS", "linux": "BIND"}
+
+# Applications that generate DNS queries, with their relative weights accumulated
+_SERVER_APPS = (
+    "system_service",
+    "dns_service",
+    "web_service",
+    "database",
+    "scheduled_task",
+)
+_SERVER_APP_CUM_WEIGHTS = tuple(itertools.accumulate((60, 15, 10, 10, 5)))
+_WORKSTATION_APPS = (
+    "browser",
+    "email_client",
+    "os_update",
+    "antivirus",
+    "office_app",
+    "chat_app",
+)
+_WORKSTATION_APP_CUM_WEIGHTS = tuple(itertools.accumulate((70, 10, 8, 5, 5, 2)))
+
+# Character sets for random subdomain labels and base64-like payloads
+_LOWER_DIGITS = "abcdefghijklmnopqrstuvwxyz0123456789"
+_B64_ALPHABET = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789+/="
+
+# Suspicious-looking address ranges that shadow domains resolve into
+_SUSPICIOUS_PREFIXES = ("185.220.", "45.95.", "91.219.", "103.15.")
+
 # Departmental segmentation for more realistic network simulation
 DEPARTMENTS = [
     {
@@ -558,6 +644,12 @@ DEPARTMENTS = [
     },
 ]
 
+# Department-based user names (50 per department), formatted once
+_DEPARTMENT_USERS = {
+    dept["name"]: tuple(f"user_{dept['name'].lower()}_{i}" for i in range(1, 51))
+    for dept in DEPARTMENTS
+}
+
 # Define workday patterns for realistic activity cycles
 WORKDAY_HOURS = {
     0: 0.1,  # 12am: 10% of normal activity (maintenance, etc)
@@ -651,72 +743,110 @@ ANOMALY_CONFIG = {
 }
 
 
+# Derive per-host random generator seeds from the master seed
+def spawn_seeds(master_seed, count):
+    """
+    Derive independent, reproducible child seeds from a master seed
+    Each child seeds its own random.Random, so hosts never share a stream;
+    the seed (not the generator) is what gets handed to a worker process
+    Without a master seed every child is seeded from the OS instead
+    """
+    if master_seed is None:
+        return [None] * count
+    return [f"{master_seed}-{i}" for i in range(count)]
+
+
+# Format a 32-bit integer as a dotted-quad IPv4 address
+def int_to_ip(value):
+    return (
+        f"{value >> 24 & 0xFF}.{value >> 16 & 0xFF}.{value >> 8 & 0xFF}.{value & 0xFF}"
+    )
+
+
+# Decimal strings of every octet value, indexed by the value itself
+_OCTETS = tuple(str(value) for value in range(256))
+_NONZERO_OCTETS = _OCTETS[1:]
+
+
+# Random public-looking IPv4 address (first and last octet never 0)
+def random_ipv4(rng):
+    """
+    Two bulk picks for the non-zero outer octets and one 16-bit draw for
+    the inner pair, joined from precomputed octet strings
+    """
+    first, last = rng.choices(_NONZERO_OCTETS, k=2)
+    inner = rng.getrandbits(16)
+    return f"{first}.{_OCTETS[inner >> 8]}.{_OCTETS[inner & 0xFF]}.{last}"
+
+
 # Generate internal hosts based on departmental structure with realistic names
-def generate_internal_hosts():
+def generate_internal_hosts(rng):
     hosts = []
 
     # Generate hosts for each department
     for dept in DEPARTMENTS:
+        # Derive host addresses arithmetically instead of enumerating the subnet
         subnet = ipaddress.ip_network(dept["subnet"])
-        ip_list = list(subnet.hosts())
+        first_host = int(subnet.network_address) + 1
+        usable_hosts = subnet.num_addresses - 2  # Skip network and broadcast
 
-        for i in range(min(dept["host_count"], len(ip_list))):
-            ip = str(ip_list[i])
+        for i in range(min(dept["host_count"], usable_hosts)):
+            ip = int_to_ip(first_host + i)
 
             # Select a random name from the common names list
-            name = random.choice(COMMON_NAMES)
+            name = rng.choice(COMMON_NAMES)
 
             # Determine OS type
             if dept["name"] == "Servers":
                 os_type = (
-                    "linux" if random.random() < 0.8 else "windows"
+                    "linux" if rng.random() < 0.8 else "windows"
                 )  # 80% Linux servers
 
                 if os_type == "linux":
-                    linux_dist = random.choice(LINUX_DISTRIBUTIONS)
+                    linux_dist = rng.choice(LINUX_DISTRIBUTIONS)
                     hostname_prefix = (
-                        f"{random.choice(['srv', 'app', 'db', 'web', 'api'])}"
+                        f"{rng.choice(['srv', 'app', 'db', 'web', 'api'])}"
                     )
-                    hostname = f"{hostname_prefix}-{random.randint(100, 999)}.internal"
+                    hostname = f"{hostname_prefix}-{rng.randint(100, 999)}.internal"
                 else:
-                    win_version = random.choice(WINDOWS_OS_VERSIONS)
+                    win_version = rng.choice(WINDOWS_OS_VERSIONS)
                     hostname_prefix = (
-                        f"{random.choice(['srv', 'app', 'db', 'web', 'api'])}"
+                        f"{rng.choice(['srv', 'app', 'db', 'web', 'api'])}"
                     )
-                    hostname = f"{hostname_prefix}-{random.randint(100, 999)}.internal"
+                    hostname = f"{hostname_prefix}-{rng.randint(100, 999)}.internal"
             else:
                 # Non-server hosts get personal names
                 os_type = (
                     "linux"
-                    if random.random() < (LINUX_HOSTS_PERCENTAGE / 100)
+                    if rng.random() < (LINUX_HOSTS_PERCENTAGE / 100)
                     else "windows"
                 )
 
                 if os_type == "windows":
-                    win_version = random.choice(WINDOWS_OS_VERSIONS)
-                    device_type = random.choice(DEVICE_TYPES)
+                    win_version = rng.choice(WINDOWS_OS_VERSIONS)
+                    device_type = rng.choice(DEVICE_TYPES)
 
                     # Format: john-win10, mike-laptop, etc.
-                    if random.random() < 0.5:  # 50% chance to include department
+                    if rng.random() < 0.5:  # 50% chance to include department
                         hostname = f"{name}-{win_version}-{dept['name'].lower()}"
                     else:
                         hostname = f"{name}-{win_version}"
                 else:
-                    linux_dist = random.choice(LINUX_DISTRIBUTIONS)
-                    device_type = random.choice(DEVICE_TYPES)
+                    linux_dist = rng.choice(LINUX_DISTRIBUTIONS)
+                    device_type = rng.choice(DEVICE_TYPES)
 
                     # Format: susan-ubuntu, hr-laptop-alex, etc.
-                    if random.random() < 0.3:  # 30% chance to have department prefix
+                    if rng.random() < 0.3:  # 30% chance to have department prefix
                         hostname = f"{dept['name'].lower()}-{device_type}-{name}"
                     else:
                         hostname = f"{name}-{linux_dist}"
 
             # Add individual variance to query rates (some users are heavier than others)
             min_rate, max_rate = dept["query_rate_range"]
-            base_query_rate = random.randint(min_rate, max_rate)
+            base_query_rate = rng.randint(min_rate, max_rate)
 
             # Add up to ±30% individual variance
-            individual_multiplier = random.uniform(0.7, 1.3)
+            individual_multiplier = rng.uniform(0.7, 1.3)
             query_rate = int(base_query_rate * individual_multiplier)
 
             # Ensure minimum query rate
@@ -724,6 +854,7 @@ def generate_internal_hosts():
 
             hosts.append(
                 {
+                    "host_id": len(hosts),  # Index into the per-host RNG list
                     "ip": ip,
                     "hostname": hostname,
                     "os": os_type,
@@ -736,196 +867,248 @@ def generate_internal_hosts():
     return hosts
 
 
+# Generate many random strings with a single bulk draw from the alphabet
+def random_strings(alphabet, lengths, rng):
+    """
+    Return one random string per requested length
+    All characters come from one rng.choices call and are sliced apart,
+    instead of a per-character choice() call
+    """
+    chars = "".join(rng.choices(alphabet, k=sum(lengths)))
+    strings = []
+    offset = 0
+    for length in lengths:
+        strings.append(chars[offset : offset + length])
+        offset += length
+    return strings
+
+
+# Meaningful words that normal subdomains are built from
+_COMMON_SUBDOMAIN_PARTS = (
+    "www",
+    "mail",
+    "ftp",
+    "smtp",
+    "pop",
+    "api",
+    "cdn",
+    "dev",
+    "test",
+    "prod",
+    "stage",
+    "uat",
+    "auth",
+    "login",
+    "secure",
+    "shop",
+    "store",
+    "blog",
+    "docs",
+)
+
+# Number of parts in a subdomain for each entropy level
+_SUBDOMAIN_PART_COUNTS = {
+    "normal": range(1, 3),  # Normal subdomains are relatively short
+    "high": range(3, 7),  # More complex subdomains for shadowing/malicious
+    "extreme": range(5, 16),  # Extremely long for data exfiltration
+}
+
+# Label lengths of random subdomain parts for each entropy level
+_RANDOM_PART_LENGTHS = {
+    "normal": range(3, 7),
+    "high": range(10, 16),
+    "extreme": range(40, 61),
+}
+
+
 # Generate subdomains for a given domain
-def generate_subdomain(domain, length=None, entropy="normal"):
+def generate_subdomain(domain, rng, length=None, entropy="normal"):
     if length is None:
-        if entropy == "normal":
-            length = random.randint(1, 2)  # Normal subdomains are relatively short
-        elif entropy == "high":
-            length = random.randint(
-                3, 6
-            )  # More complex subdomains for shadowing/malicious
-        elif entropy == "extreme":
-            length = random.randint(5, 15)  # Extremely long for data exfiltration
-
-    subdomain_parts = []
-    for _ in range(length):
-        if entropy == "normal":
-            # Normal subdomains often have meaningful words
-            part_options = [
-                "www",
-                "mail",
-                "ftp",
-                "smtp",
-                "pop",
-                "api",
-                "cdn",
-                "dev",
-                "test",
-                "prod",
-                "stage",
-                "uat",
-                "auth",
-                "login",
-                "secure",
-                "shop",
-                "store",
-                "blog",
-                "docs",
-            ]
-            if (
-                random.random() < 0.8 and part_options
-            ):  # 80% chance of using common subdomain
-                part = random.choice(part_options)
-            else:
-                part_length = random.randint(3, 6)
-                part = "".join(
-                    random.choice("abcdefghijklmnopqrstuvwxyz0123456789")
-                    for _ in range(part_length)
-                )
-        elif entropy == "high":
-            # High entropy subdomains have more randomness
-            part_length = random.randint(10, 15)
-            part = "".join(
-                random.choice("abcdefghijklmnopqrstuvwxyz0123456789")
-                for _ in range(part_length)
-            )
-        elif entropy == "extreme":
-            # Extreme entropy subdomains for data exfiltration
-            part_length = random.randint(40, 60)
-            part = "".join(
-                random.choice("abcdefghijklmnopqrstuvwxyz0123456789")
-                for _ in range(part_length)
+        length = rng.choice(_SUBDOMAIN_PART_COUNTS[entropy])
+
+    if entropy == "normal":
+        # Normal subdomains often have meaningful words: 80% chance of a
+        # common part, otherwise a short random label
+        short_lengths = _RANDOM_PART_LENGTHS["normal"]
+        subdomain_parts = [
+            (
+                rng.choice(_COMMON_SUBDOMAIN_PARTS)
+                if rng.random() < 0.8
+                else "".join(rng.choices(_LOWER_DIGITS, k=rng.choice(short_lengths)))
             )
+            for _ in range(length)
+        ]
+    else:
+        # High entropy subdomains have more randomness; extreme ones are for
+        # data exfiltration. All labels come from one bulk draw
+        subdomain_parts = random_strings(
+            _LOWER_DIGITS, rng.choices(_RANDOM_PART_LENGTHS[entropy], k=length), rng
+        )
 
-        subdomain_parts.append(part)
-
-    return ".".join(subdomain_parts) + "." + domain
-
-
-# Generate normal DNS event with more realistic patterns
-def generate_normal_dns_event(host, timestamp):
-    # Select domain based on a realistic distribution (frequent sites more common)
-    domain_weights = [
-        100,
-        90,
-        85,
-        80,
-        75,
-        70,
-        65,
-        60,
-        55,
-        50,
-        45,
-        40,
-        35,
-        30,
-        25,
-        20,
-        15,
-        10,
-        5,
-        5,
-        5,
-        5,
-        5,
-        5,
-    ]
-    domain = random.choices(
-        TOP_DOMAINS[: len(domain_weights)],
-        weights=domain_weights[: len(TOP_DOMAINS)],
-        k=1,
-    )[0]
+    subdomain_parts.append(domain)
+    return ".".join(subdomain_parts)
 
-    # Query pattern based on host type and time of day
-    is_server = host["department"] == "Servers"
 
-    # Servers more likely to query direct domains and have consistent patterns
-    if is_server:
-        if random.random() < 0.9:  # 90% direct domain for servers
-            query = domain
-        else:
-            query = generate_subdomain(domain)
-    else:
-        if random.random() < 0.7:  # 70% direct domain for workstations
-            query = domain
-        else:
-            query = generate_subdomain(domain)
-
-    # Choose record type based on weighted probabilities
-    record_type = random.choices(
-        list(RECORD_TYPES.keys()), weights=list(RECORD_TYPES.values()), k=1
-    )[0]
-
-    # Select reply code based on weighted probabilities
-    reply_code = random.choices(
-        list(REPLY_CODES.keys()), weights=list(REPLY_CODES.values()), k=1
-    )[0]
-
-    # Set answer based on reply code and record type
-    answer = None
-    if reply_code == "NOERROR":
-        if record_type == "A":
-            answer = f"{random.randint(1, 255)}.{random.randint(0, 255)}.{random.randint(0, 255)}.{random.randint(1, 255)}"
-        elif record_type == "AAAA":
-            answer = f"2001:db8::{random.randint(1, 9999):x}"
-        elif record_type == "MX":
-            answer = f"{random.randint(10, 30)} mail{random.randint(1, 5)}.{domain}"
-        elif record_type == "CNAME":
-            answer = f"cdn{random.randint(1, 10)}.{domain}"
-        elif record_type == "TXT":
-            answer = f"v=spf1 include:{domain} ~all"
-        elif record_type == "NS":
-            answer = f"ns{random.randint(1, 5)}.{domain}"
-        elif record_type == "PTR":
-            answer = f"{random.choice(['mail', 'www', 'ftp'])}.{domain}"
-        elif record_type == "ANY":
-            answer = "Multiple records returned"
-
-    # Select a DNS server - Most companies have 2-3 internal DNS servers
-    dns_servers = ["10.0.0.1", "10.0.0.2", "10.0.0.3"]
-    dns_server = random.choice(dns_servers)
+# Generate many random-label subdomains of one domain with bulk draws
+def generate_subdomain_batch(domain, rng, count, entropy="high"):
+    """
+    Same distribution as count generate_subdomain calls with this entropy
+    For the high and extreme levels the part counts, label lengths and
+    label characters each come from one draw for the whole batch
+    """
+    if entropy == "normal":
+        return [generate_subdomain(domain, rng) for _ in range(count)]
+
+    part_counts = rng.choices(_SUBDOMAIN_PART_COUNTS[entropy], k=count)
+    label_lengths = rng.choices(_RANDOM_PART_LENGTHS[entropy], k=sum(part_counts))
+    labels = iter(random_strings(_LOWER_DIGITS, label_lengths, rng))
+
+    subdomains = []
+    for part_count in part_counts:
+        subdomain_parts = list(itertools.islice(labels, part_count))
+        subdomain_parts.append(domain)
+        subdomains.append(".".join(subdomain_parts))
+    return subdomains
+
+
+# Pick one key from a table of cumulative weights with a single bisect
+def weighted_choice(keys, cum_weights, rng):
+    # Cap the index like random.choices does, in case rounding lands on the total
+    hi = len(cum_weights) - 1
+    return keys[bisect.bisect(cum_weights, rng.random() * cum_weights[-1], 0, hi)]
+
+
+# Pick a reply code based on weighted probabilities
+def sample_reply_code(rng):
+    return weighted_choice(_REPLY_CODE_KEYS, _REPLY_CODE_CUM_WEIGHTS, rng)
+
+
+# Documentation-prefix IPv6 answers 2001:db8::1 to 2001:db8::270f
+_AAAA_ANSWERS = tuple(f"2001:db8::{n:x}" for n in range(1, 10000))
+
+# Host labels and MX preferences that answers pick from with one choice() each
+_MX_PREFERENCES = tuple(str(preference) for preference in range(10, 31))
+_MAIL_LABELS = tuple(f"mail{n}" for n in range(1, 6))
+_CDN_LABELS = tuple(f"cdn{n}" for n in range(1, 11))
+_NS_LABELS = tuple(f"ns{n}" for n in range(1, 6))
+_PTR_LABELS = ("mail", "www", "ftp")
+
+
+# Answer builders keyed by record type, dispatched with one dict lookup
+_ANSWER_BUILDERS = {
+    "A": lambda domain, rng: random_ipv4(rng),
+    "AAAA": lambda domain, rng: rng.choice(_AAAA_ANSWERS),
+    "MX": lambda domain, rng: (
+        f"{rng.choice(_MX_PREFERENCES)} {rng.choice(_MAIL_LABELS)}.{domain}"
+    ),
+    "CNAME": lambda domain, rng: f"{rng.choice(_CDN_LABELS)}.{domain}",
+    "TXT": lambda domain, rng: f"v=spf1 include:{domain} ~all",
+    "NS": lambda domain, rng: f"{rng.choice(_NS_LABELS)}.{domain}",
+    "PTR": lambda domain, rng: f"{rng.choice(_PTR_LABELS)}.{domain}",
+    "ANY": lambda domain, rng: "Multiple records returned",
+}
+
+
+# Build the answer for a query of the given record type
+def build_answer(record_type, domain, reply_code, rng):
+    # Only successful lookups of known record types carry an answer
+    if reply_code != "NOERROR":
+        return None
+    builder = _ANSWER_BUILDERS.get(record_type)
+    return builder(domain, rng) if builder else None
+
+
+# Sample the per-event fields that depend on the querying host, for many events
+def _sample_client_columns(host, rng, count):
+    """
+    Draw the DNS server, application, user, response time and transport of
+    count events from host, one list per field
+    Weighted picks are single bulk random.choices calls
+    """
+    # Select one of the internal DNS servers
+    dns_servers = rng.choices(_DNS_SERVERS, k=count)
 
     # Determine the application that generated the DNS query
     if host["department"] == "Servers":
-        app = random.choices(
-            [
-                "system_service",
-                "dns_service",
-                "web_service",
-                "database",
-                "scheduled_task",
-            ],
-            weights=[60, 15, 10, 10, 5],
-            k=1,
-        )[0]
+        apps = rng.choices(_SERVER_APPS, cum_weights=_SERVER_APP_CUM_WEIGHTS, k=count)
     else:
-        app = random.choices(
-            [
-                "browser",
-                "email_client",
-                "os_update",
-                "antivirus",
-                "office_app",
-                "chat_app",
-            ],
-            weights=[70, 10, 8, 5, 5, 2],
-            k=1,
-        )[0]
+        apps = rng.choices(
+            _WORKSTATION_APPS, cum_weights=_WORKSTATION_APP_CUM_WEIGHTS, k=count
+        )
 
-    # Determine action based on reply code (CIM compliance)
-    if reply_code == "NOERROR":
-        action = "resolved"
-    else:
-        action = "queried"
+    # Department-based users
+    users = rng.choices(_DEPARTMENT_USERS[host["department"]], k=count)
 
-    # Generate response time (previously called duration)
-    response_time = random.uniform(0.001, 0.05)  # Query response time in seconds
+    # Generate response time (previously called duration) in seconds
+    spread = 0.05 - 0.001  # Same arithmetic as rng.uniform(0.001, 0.05)
+    response_times = [0.001 + spread * rng.random() for _ in range(count)]
 
+    transports = [_TRANSPORTS[rng.random() >= 0.95] for _ in range(count)]
+    return dns_servers, apps, users, response_times, transports
+
+
+# Sample the host-dependent fields of a single event
+def _sample_client_fields(host, rng):
+    return tuple(column[0] for column in _sample_client_columns(host, rng, 1))
+
+
+# The default TIMESTAMP_FORMAT and an equivalent %-template over integer fields,
+# which skips strftime's format parsing and struct_tm conversion
+_ISO_TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
+_ISO_TIMESTAMP_TEMPLATE = "%04d-%02d-%02dT%02d:%02d:%02d.%06d"
+
+
+# Format an event time given as seconds (int or float) after start_time
+def format_event_time(start_time, offset_seconds):
+    timestamp = start_time + datetime.timedelta(seconds=offset_seconds)
+    if TIMESTAMP_FORMAT != _ISO_TIMESTAMP_FORMAT:
+        return timestamp.strftime(TIMESTAMP_FORMAT)
+    return _ISO_TIMESTAMP_TEMPLATE % (
+        timestamp.year,
+        timestamp.month,
+        timestamp.day,
+        timestamp.hour,
+        timestamp.minute,
+        timestamp.second,
+        timestamp.microsecond,
+    )
+
+
+# Format many whole-second offsets after start_time in one pass
+def format_event_times(start_time, offsets):
+    """
+    Format whole-second offsets after start_time without building a datetime
+    per event: each day's date string is formatted once and the clock time
+    comes from integer arithmetic on the offset
+    Only the default ISO TIMESTAMP_FORMAT takes this path
+    """
+    if TIMESTAMP_FORMAT != _ISO_TIMESTAMP_FORMAT:
+        return [format_event_time(start_time, offset) for offset in offsets]
+
+    midnight = start_time.replace(hour=0, minute=0, second=0, microsecond=0)
+    start_second = (start_time - midnight).seconds  # Seconds into the first day
+    fraction = f".{start_time.microsecond:06d}"  # Offsets are whole seconds
+    dates = {}
+
+    formatted = []
+    for offset in offsets:
+        day, second = divmod(start_second + offset, 86400)
+        date = dates.get(day)
+        if date is None:
+            date = dates[day] = (midnight + datetime.timedelta(days=day)).strftime(
+                "%Y-%m-%dT"
+            )
+        hour, second = divmod(second, 3600)
+        minute, second = divmod(second, 60)
+        formatted.append(f"{date}{hour:02d}:{minute:02d}:{second:02d}{fraction}")
+    return formatted
+
+
+# Assemble the fields shared by every DNS event from already-sampled values
+def _event_fields(host, timestamp, dns_server, app, user, response_time, transport):
     # Generate DNS event following Splunk's CIM for Network Resolution
-    event = {
-        "timestamp": timestamp.strftime(TIMESTAMP_FORMAT),
+    return {
+        "timestamp": timestamp,  # Already formatted with TIMESTAMP_FORMAT
         "source": "dns",
         "sourcetype": "dns",
         "host": host["hostname"],
@@ -935,252 +1118,308 @@ def generate_normal_dns_event(host, timestamp):
         "src_host": host["hostname"],
         "dest_port": 53,
         "dest": dns_server,  # Internal DNS server
-        "record_type": record_type,
-        "query_type": record_type,  # CIM field - copy of record_type
-        "query": query,
-        "answer": answer,
+        # Query fields keep their place in the output and are set by _complete_event
+        "record_type": None,
+        "query_type": None,
+        "query": None,
+        "answer": None,
         "message_type": "QUERY",
-        "reply_code": reply_code,
-        "action": action,  # CIM field - resolved or queried
+        "reply_code": None,
+        "action": None,
         "app": app,  # CIM field - application that generated the query
-        "user": f"user_{host['department'].lower()}_{random.randint(1, 50)}",  # Department-based user
+        "user": user,
         "response_time": response_time,  # CIM field (renamed from duration)
-        "transport": "UDP" if random.random() < 0.95 else "TCP",
-        "vendor_product": "Microsoft DNS" if host["os"] == "windows" else "BIND",
+        "transport": transport,
+        "vendor_product": _VENDOR_PRODUCTS[host["os"]],
         "department": host["department"],  # Adding department info for analysis
-        # Extract parent domain and subdomain for Splunk analysis
-        "parent_domain": (
-            query.split(".")[-2] + "." + query.split(".")[-1]
-            if len(query.split(".")) > 1
-            else query
-        ),
-        "subdomain": (
-            ".".join(query.split(".")[:-2]) if len(query.split(".")) > 2 else ""
-        ),
     }
 
+
+# Build the fields shared by every DNS event, regardless of what was queried
+def _make_event_skeleton(host, timestamp, rng):
+    """
+    Build the host, server and transport fields common to all DNS events
+    Query, record type, reply code and answer are filled in by
+    _complete_event so callers never sample values they would discard
+    """
+    return _event_fields(host, timestamp, *_sample_client_fields(host, rng))
+
+
+# Split a query into its parent domain and subdomain for Splunk analysis
+def split_query(query):
+    labels = query.split(".")
+    # Few distinct parent domains repeat across many events, so share one copy
+    parent_domain = sys.intern(".".join(labels[-2:])) if len(labels) > 1 else query
+    subdomain = ".".join(labels[:-2]) if len(labels) > 2 else ""
+    return parent_domain, subdomain
+
+
+# Fill in the query-specific fields of an event built by _make_event_skeleton
+def _complete_event(event, query, record_type, reply_code, answer):
+    event["record_type"] = record_type
+    event["query_type"] = record_type  # CIM field - copy of record_type
+    event["query"] = query
+    event["answer"] = answer
+    event["reply_code"] = reply_code
+    # Determine action based on reply code (CIM compliance)
+    event["action"] = "resolved" if reply_code == "NOERROR" else "queried"
+    event["parent_domain"], event["subdomain"] = split_query(query)
     return event
 
 
+# Sample the query-specific fields of many normal DNS events with realistic patterns
+def _sample_normal_queries(is_server, rng, count):
+    """
+    Draw the query, record type, reply code and answer of count normal
+    events, one list per field
+    Domains, record types and reply codes are single bulk random.choices calls
+    """
+    # Select domains based on a realistic distribution (frequent sites more common)
+    domains = rng.choices(_DOMAIN_CHOICES, cum_weights=_DOMAIN_CUM_WEIGHTS, k=count)
+
+    # Servers more likely to query direct domains and have consistent patterns
+    direct_share = 0.9 if is_server else 0.7  # 90% servers, 70% workstations
+    queries = [
+        domain if rng.random() < direct_share else generate_subdomain(domain, rng)
+        for domain in domains
+    ]
+
+    # Choose record types and reply codes based on weighted probabilities
+    record_types = rng.choices(
+        _RECORD_TYPE_KEYS, cum_weights=_RECORD_TYPE_CUM_WEIGHTS, k=count
+    )
+    reply_codes = rng.choices(
+        _REPLY_CODE_KEYS, cum_weights=_REPLY_CODE_CUM_WEIGHTS, k=count
+    )
+    answers = [
+        build_answer(record_type, domain, reply_code, rng)
+        for record_type, domain, reply_code in zip(record_types, domains, reply_codes)
+    ]
+
+    return queries, record_types, reply_codes, answers
+
+
+# Sample random event times in the hours following start_time
+def sample_timestamps(start_time, max_hours, count, rng):
+    """
+    Draw count timestamps uniformly between start_time and the end of hour
+    max_hours after it, as whole-second integer offsets from start_time,
+    and return them formatted for the events
+    """
+    window_seconds = (max_hours + 1) * 3600
+    offsets = [rng.randrange(window_seconds) for _ in range(count)]
+    return format_event_times(start_time, offsets)
+
+
 # Anomaly generation functions - updated to match Splunk detection methods
 
 
 # 1. C2 Tunneling - High volume of DNS queries
-def generate_c2_tunneling(base_host, start_time):
+def generate_c2_tunneling(host, start_time, rng):
     """
     Generate events with anomalously high query volumes
     This simulates Command and Control or data exfiltration
     Designed to trigger: dns_c2_tunneling_detection in Splunk
     """
-    events = []
-    host = base_host.copy()
-    c2_domain = random.choice(MALICIOUS_DOMAINS)
+    c2_domain = rng.choice(MALICIOUS_DOMAINS)
     config = ANOMALY_CONFIG["C2_TUNNELING"]
+    description = config["description"]
 
     # Generate high concentration of events in 1-hour window to trigger hourly detection
     time_window_hours = config["time_window_hours"]
     num_events = config["num_events"]
+    events = [None] * num_events
 
-    # Generate hourly timestamps to spread the events within the window
-    for i in range(num_events):
-        timestamp = start_time + datetime.timedelta(
-            hours=random.uniform(0, time_window_hours),
-            minutes=random.randint(0, 59),
-            seconds=random.randint(0, 59),
-        )
+    # C2 traffic has distinct patterns - highly random subdomains
+    queries = generate_subdomain_batch(c2_domain, rng, num_events, entropy="high")
 
-        event = generate_normal_dns_event(host, timestamp)
+    # Most C2 uses A records, sometimes AAAA and TXT
+    record_types = rng.choices(["A", "AAAA", "TXT"], weights=[70, 15, 15], k=num_events)
 
-        # C2 traffic has distinct patterns - highly random subdomains
-        event["query"] = generate_subdomain(c2_domain, entropy="high")
+    # Spread the events across the window to trigger hourly detection
+    timestamps = sample_timestamps(start_time, time_window_hours, num_events, rng)
 
-        # Most C2 uses A records, sometimes AAAA and TXT
-        event["record_type"] = random.choices(
-            ["A", "AAAA", "TXT"], weights=[70, 15, 15], k=1
-        )[0]
+    for i, (timestamp, query, record_type) in enumerate(
+        zip(timestamps, queries, record_types)
+    ):
+        event = _make_event_skeleton(host, timestamp, rng)
+        reply_code = sample_reply_code(rng)
+        answer = build_answer(record_type, c2_domain, reply_code, rng)
+        _complete_event(event, query, record_type, reply_code, answer)
 
         # Add anomaly type and metadata
         event["anomaly_type"] = "C2_TUNNELING"
-        event["anomaly_description"] = config["description"]
-        events.append(event)
+        event["anomaly_description"] = description
+        events[i] = event
 
     return events
 
 
 # 2. Beaconing Detection - Regular, periodic DNS queries
-def generate_beaconing(base_host, start_time):
+def generate_beaconing(host, start_time, rng):
     """
     Create events at very regular intervals (beaconing)
     This simulates Command and Control communication with an infection
     Designed to trigger: dns_beaconing_detection in Splunk
     """
-    events = []
-    host = base_host.copy()
-    c2_domain = random.choice(MALICIOUS_DOMAINS)
+    c2_domain = rng.choice(MALICIOUS_DOMAINS)
     config = ANOMALY_CONFIG["BEACONING"]
+    description = config["description"]
 
     interval_minutes = config["interval_minutes"]
     num_events = config["num_events"]
+    events = [None] * num_events
     jitter_seconds = config["jitter_seconds"]
 
-    # Use the same parent domain for all queries to establish a pattern
-    # Create events at regular intervals with minimal jitter
-    for i in range(num_events):
-        # Add minimal jitter to the regular interval
-        jitter = random.uniform(-jitter_seconds, jitter_seconds)
-        timestamp = start_time + datetime.timedelta(
-            minutes=(i * interval_minutes), seconds=jitter
+    interval_seconds = interval_minutes * 60
+
+    # Use the same parent domain for all queries to establish a pattern, with
+    # slight variations in subdomain; these depend only on the beacon index
+    queries = [f"beacon-{i:04d}.{c2_domain}" for i in range(num_events)]
+
+    # Add minimal jitter to the regular interval
+    jitters = [rng.uniform(-jitter_seconds, jitter_seconds) for _ in range(num_events)]
+
+    # Add consistent IP answers to establish pattern
+    # C2 servers often have specific IP ranges
+    c2_ips = [
+        f"93.184.{third}.{fourth}"
+        for third, fourth in zip(
+            rng.choices(range(1, 6), k=num_events),
+            rng.choices(range(1, 255), k=num_events),
         )
+    ]
 
-        event = generate_normal_dns_event(host, timestamp)
+    # Create events at regular intervals with minimal jitter
+    for i, (query, jitter, c2_ip) in enumerate(zip(queries, jitters, c2_ips)):
+        timestamp = format_event_time(start_time, i * interval_seconds + jitter)
 
-        # Use a consistent domain pattern with slight variations in subdomain
-        subdomain = f"beacon-{i:04d}"
-        event["query"] = f"{subdomain}.{c2_domain}"
+        event = _make_event_skeleton(host, timestamp, rng)
 
         # Most beaconing uses A records
-        event["record_type"] = "A" if random.random() < 0.95 else "TXT"
+        record_type = "A" if rng.random() < 0.95 else "TXT"
+        reply_code = sample_reply_code(rng)
 
-        # Add consistent IP answers to establish pattern
-        if event["record_type"] == "A" and event["reply_code"] == "NOERROR":
-            # C2 servers often have specific IP ranges
-            event["answer"] = f"93.184.{random.randint(1, 5)}.{random.randint(1, 254)}"
+        if record_type == "A" and reply_code == "NOERROR":
+            answer = c2_ip
+        else:
+            answer = build_answer(record_type, c2_domain, reply_code, rng)
+        _complete_event(event, query, record_type, reply_code, answer)
 
         # Add anomaly type and metadata
         event["anomaly_type"] = "BEACONING"
-        event["anomaly_description"] = config["description"]
-        event["gap"] = interval_minutes * 60 + jitter  # For analysis
-        events.append(event)
+        event["anomaly_description"] = description
+        event["gap"] = interval_seconds + jitter  # For analysis
+        events[i] = event
 
     return events
 
 
 # 3. TXT Record Anomaly Detection - Unusual use of TXT records
-def generate_txt_record_anomaly(base_host, start_time):
+def generate_txt_record_anomaly(host, start_time, rng):
     """
     Generate excessive use of TXT records
     This simulates Command and Control or data exfiltration via DNS
     Designed to trigger: dns_txt_record_detection in Splunk
     """
-    events = []
-    host = base_host.copy()
-    c2_domain = random.choice(MALICIOUS_DOMAINS)
+    c2_domain = rng.choice(MALICIOUS_DOMAINS)
     config = ANOMALY_CONFIG["TXT_RECORD_ANOMALY"]
+    description = config["description"]
 
     num_events = config["num_events"]
+    events = [None] * num_events
     min_content_length = config["min_content_length"]
     max_content_length = config["max_content_length"]
+    prefixes = ("cmd=", "exec=", "run=", "data=", "")
 
-    # Generate many TXT record queries from the same host
-    for i in range(num_events):
-        # Spread over a few hours to ensure hourly counts are high
-        timestamp = start_time + datetime.timedelta(
-            hours=random.randint(0, 3),
-            minutes=random.randint(0, 59),
-            seconds=random.randint(0, 59),
-        )
-
-        event = generate_normal_dns_event(host, timestamp)
-        event["record_type"] = "TXT"
+    # Create unique subdomain for each query
+    queries = generate_subdomain_batch(c2_domain, rng, num_events, entropy="high")
 
-        # Create unique subdomain for each query
-        event["query"] = generate_subdomain(c2_domain, entropy="high")
+    # Generate many TXT record queries from the same host
+    # Spread over a few hours to ensure hourly counts are high
+    timestamps = sample_timestamps(start_time, 3, num_events, rng)
+    for i, (timestamp, query) in enumerate(zip(timestamps, queries)):
+        event = _make_event_skeleton(host, timestamp, rng)
 
         # Simulate encoded data in TXT record (base64-like)
-        data_length = random.randint(min_content_length, max_content_length)
+        data_length = rng.randint(min_content_length, max_content_length)
         # Create suspicious-looking base64 data with command patterns
-        prefixes = ["cmd=", "exec=", "run=", "data=", ""]
-        prefix = random.choice(prefixes)
+        prefix = rng.choice(prefixes)
 
-        encoded_data = "".join(
-            random.choice(
-                "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789+/="
-            )
-            for _ in range(data_length - len(prefix))
-        )
+        encoded_data = "".join(rng.choices(_B64_ALPHABET, k=data_length - len(prefix)))
 
-        event["answer"] = f'"{prefix}{encoded_data}"'
+        answer = f'"{prefix}{encoded_data}"'
+        _complete_event(event, query, "TXT", sample_reply_code(rng), answer)
         event["txt_content"] = f"{prefix}{encoded_data}"  # For Splunk analysis
 
         # Add anomaly type and metadata
         event["anomaly_type"] = "TXT_RECORD_ANOMALY"
-        event["anomaly_description"] = config["description"]
-        events.append(event)
+        event["anomaly_description"] = description
+        events[i] = event
 
     return events
 
 
 # 4. ANY Record Anomaly Detection - Reconnaissance using ANY queries
-def generate_any_record_anomaly(base_host, start_time):
+def generate_any_record_anomaly(host, start_time, rng):
     """
     Generate excessive use of ANY records
     This often indicates reconnaissance activity or amplification attacks
     Designed to trigger: dns_any_record_detection in Splunk
     """
-    events = []
-    host = base_host.copy()
     config = ANOMALY_CONFIG["ANY_RECORD_ANOMALY"]
+    description = config["description"]
     num_events = config["num_events"]
+    events = [None] * num_events
 
     # Use a malicious domain for the ANY record queries
-    malicious_domain = random.choice(MALICIOUS_DOMAINS)
+    malicious_domain = rng.choice(MALICIOUS_DOMAINS)
 
     # Create a sequence of ANY queries for reconnaissance
-    for i in range(num_events):
-        timestamp = start_time + datetime.timedelta(
-            hours=random.randint(0, 4),
-            minutes=random.randint(0, 59),
-            seconds=random.randint(0, 59),
-        )
-
-        event = generate_normal_dns_event(host, timestamp)
-        event["record_type"] = "ANY"
+    timestamps = sample_timestamps(start_time, 4, num_events, rng)
+    for i, timestamp in enumerate(timestamps):
+        event = _make_event_skeleton(host, timestamp, rng)
 
         # Generate different subdomains of the malicious domain
-        if random.random() < 0.7:  # 70% chance to use subdomains
+        if rng.random() < 0.7:  # 70% chance to use subdomains
             subdomain = f"recon-{i % 100:03d}"
-            event["query"] = f"{subdomain}.{malicious_domain}"
+            query = f"{subdomain}.{malicious_domain}"
         else:
             # Sometimes query the apex domain directly
-            event["query"] = malicious_domain
+            query = malicious_domain
 
         # ANY queries typically return multiple records
-        if event["reply_code"] == "NOERROR":
-            event["answer"] = "Multiple records returned"
+        reply_code = sample_reply_code(rng)
+        answer = build_answer("ANY", malicious_domain, reply_code, rng)
+        _complete_event(event, query, "ANY", reply_code, answer)
 
         # Add anomaly type and metadata
         event["anomaly_type"] = "ANY_RECORD_ANOMALY"
-        event["anomaly_description"] = config["description"]
-        events.append(event)
+        event["anomaly_description"] = description
+        events[i] = event
 
     return events
 
 
 # 5. HINFO Record Anomaly Detection - Reconnaissance using HINFO queries
-def generate_hinfo_record_anomaly(base_host, start_time):
+def generate_hinfo_record_anomaly(host, start_time, rng):
     """
     Generate use of HINFO record types for reconnaissance
     This can indicate attempts to gather system information
     Designed to trigger: dns_hinfo_record_detection in Splunk
     """
-    events = []
-    host = base_host.copy()
     config = ANOMALY_CONFIG["HINFO_RECORD_ANOMALY"]
+    description = config["description"]
     num_events = config["num_events"]
+    events = [None] * num_events
 
     # Use a malicious domain for the HINFO record queries
-    malicious_domain = random.choice(MALICIOUS_DOMAINS)
+    malicious_domain = rng.choice(MALICIOUS_DOMAINS)
 
     # HINFO queries are very rare, so this is clearly anomalous behavior
-    for i in range(num_events):
-        timestamp = start_time + datetime.timedelta(
-            hours=random.randint(0, 3),
-            minutes=random.randint(0, 59),
-            seconds=random.randint(0, 59),
-        )
-
-        event = generate_normal_dns_event(host, timestamp)
-        event["record_type"] = "HINFO"
+    timestamps = sample_timestamps(start_time, 3, num_events, rng)
+    for i, timestamp in enumerate(timestamps):
+        event = _make_event_skeleton(host, timestamp, rng)
 
         # Targeting various high-value targets for host information gathering
         high_value_targets = [
@@ -1192,254 +1431,261 @@ def generate_hinfo_record_anomaly(base_host, start_time):
             "db",
             "auth",
         ]
-        target = random.choice(high_value_targets)
+        target = rng.choice(high_value_targets)
 
         # Use the malicious domain instead of legitimate ones
-        event["query"] = f"{target}.{malicious_domain}"
+        query = f"{target}.{malicious_domain}"
 
         # Add a realistic HINFO response when successful
-        if event["reply_code"] == "NOERROR":
+        reply_code = sample_reply_code(rng)
+        answer = None
+        if reply_code == "NOERROR":
             os_types = ["Linux", "Windows Server", "FreeBSD", "Ubuntu", "CentOS"]
             cpu_types = ["x86_64", "ARM64", "Intel Xeon", "AMD EPYC", "Intel Core i7"]
-            event["answer"] = (
-                f'"{random.choice(os_types)}" "{random.choice(cpu_types)}"'
-            )
+            answer = f'"{rng.choice(os_types)}" "{rng.choice(cpu_types)}"'
+        _complete_event(event, query, "HINFO", reply_code, answer)
 
         # Add anomaly type and metadata
         event["anomaly_type"] = "HINFO_RECORD_ANOMALY"
-        event["anomaly_description"] = config["description"]
-        events.append(event)
+        event["anomaly_description"] = description
+        events[i] = event
 
     return events
 
 
 # 6. AXFR Record Anomaly Detection - Reconnaissance using AXFR queries
-def generate_axfr_record_anomaly(base_host, start_time):
+def generate_axfr_record_anomaly(host, start_time, rng):
     """
     Generate use of AXFR record types for zone transfer attempts
     This can indicate reconnaissance or information gathering
     Designed to trigger: dns_axfr_record_detection in Splunk
     """
-    events = []
-    host = base_host.copy()
     config = ANOMALY_CONFIG["AXFR_RECORD_ANOMALY"]
+    description = config["description"]
     num_events = config["num_events"]
+    events = [None] * num_events
 
     # Use a malicious domain for the AXFR record queries
-    malicious_domain = random.choice(MALICIOUS_DOMAINS)
+    malicious_domain = rng.choice(MALICIOUS_DOMAINS)
 
     # AXFR queries are extremely rare in normal traffic
-    for i in range(num_events):
-        timestamp = start_time + datetime.timedelta(
-            hours=random.randint(0, 2),
-            minutes=random.randint(0, 59),
-            seconds=random.randint(0, 59),
-        )
-
-        event = generate_normal_dns_event(host, timestamp)
-        event["record_type"] = "AXFR"
+    timestamps = sample_timestamps(start_time, 2, num_events, rng)
+    for i, timestamp in enumerate(timestamps):
+        event = _make_event_skeleton(host, timestamp, rng)
 
         # Target the malicious domain directly or its nameservers
-        if random.random() < 0.6:  # 60% chance to query nameserver
-            event["query"] = f"ns{random.randint(1, 3)}.{malicious_domain}"
+        if rng.random() < 0.6:  # 60% chance to query nameserver
+            query = f"ns{rng.randint(1, 3)}.{malicious_domain}"
         else:
             # Sometimes query the domain directly
-            event["query"] = malicious_domain
+            query = malicious_domain
 
         # Zone transfers are typically rejected
-        event["reply_code"] = "REFUSED" if random.random() < 0.95 else "NOERROR"
+        reply_code = "REFUSED" if rng.random() < 0.95 else "NOERROR"
 
         # Use TCP for AXFR queries (AXFR always uses TCP)
         event["transport"] = "TCP"
 
         # If successful (rare), provide a zone transfer response
-        if event["reply_code"] == "NOERROR":
-            event["answer"] = "Zone transfer successful - multiple records returned"
+        answer = None
+        if reply_code == "NOERROR":
+            answer = "Zone transfer successful - multiple records returned"
+        _complete_event(event, query, "AXFR", reply_code, answer)
 
         # Add anomaly type and metadata
         event["anomaly_type"] = "AXFR_RECORD_ANOMALY"
-        event["anomaly_description"] = config["description"]
-        events.append(event)
+        event["anomaly_description"] = description
+        events[i] = event
 
     return events
 
 
 # 7. Query Length Anomaly Detection - Unusually long DNS queries
-def generate_query_length_anomaly(base_host, start_time):
+def generate_query_length_anomaly(host, start_time, rng):
     """
     Generate unusually long DNS queries
     This often indicates data exfiltration via DNS tunneling
     Designed to trigger: dns_query_length_detection in Splunk
     """
-    events = []
-    host = base_host.copy()
-    tunnel_domain = random.choice(MALICIOUS_DOMAINS)
+    tunnel_domain = rng.choice(MALICIOUS_DOMAINS)
     config = ANOMALY_CONFIG["QUERY_LENGTH_ANOMALY"]
+    description = config["description"]
 
     num_events = config["num_events"]
+    events = [None] * num_events
     min_length = config["min_length"]
 
-    # Generate abnormally long queries for data exfil
-    for i in range(num_events):
-        timestamp = start_time + datetime.timedelta(
-            hours=random.randint(0, 5),
-            minutes=random.randint(0, 59),
-            seconds=random.randint(0, 59),
-        )
-
-        event = generate_normal_dns_event(host, timestamp)
+    # Generate an extremely long DNS query simulating encoded data
+    # This will create subdomains over 100 chars
+    queries = generate_subdomain_batch(
+        tunnel_domain, rng, num_events, entropy="extreme"
+    )
 
-        # Generate an extremely long DNS query simulating encoded data
-        # This will create subdomains over 100 chars
-        event["query"] = generate_subdomain(tunnel_domain, entropy="extreme")
+    # Make sure every query is long enough to trigger detection
+    for i, query in enumerate(queries):
+        while len(query) < min_length:
+            query = generate_subdomain(tunnel_domain, rng, entropy="extreme")
+        queries[i] = query
 
-        # Make sure query is long enough to trigger detection
-        while len(event["query"]) < min_length:
-            event["query"] = generate_subdomain(tunnel_domain, entropy="extreme")
+    # Query length anomalies often use A records to blend in
+    record_types = rng.choices(["A", "TXT"], weights=[80, 20], k=num_events)
 
-        # Query length anomalies often use A records to blend in
-        event["record_type"] = "A" if random.random() < 0.8 else "TXT"
+    # Generate abnormally long queries for data exfil
+    timestamps = sample_timestamps(start_time, 5, num_events, rng)
+    for i, (timestamp, query, record_type) in enumerate(
+        zip(timestamps, queries, record_types)
+    ):
+        event = _make_event_skeleton(host, timestamp, rng)
+        reply_code = sample_reply_code(rng)
+        answer = build_answer(record_type, tunnel_domain, reply_code, rng)
+        _complete_event(event, query, record_type, reply_code, answer)
 
         # Add query length explicitly for analysis
-        event["query_length"] = len(event["query"])
+        event["query_length"] = len(query)
 
         # Add anomaly type and metadata
         event["anomaly_type"] = "QUERY_LENGTH_ANOMALY"
-        event["anomaly_description"] = config["description"]
-        events.append(event)
+        event["anomaly_description"] = description
+        events[i] = event
 
     return events
 
 
 # 8. Domain Shadowing Detection - Many unique subdomains
-def generate_domain_shadowing(base_host, start_time):
+def generate_domain_shadowing(host, start_time, rng):
     """
     Generate many unique subdomains for a legitimate domain
     This simulates domain shadowing attacks
     Designed to trigger: dns_domain_shadowing_detection in Splunk
     """
-    events = []
-    host = base_host.copy()
     config = ANOMALY_CONFIG["DOMAIN_SHADOWING"]
+    description = config["description"]
 
     # Use a single legitimate top domain to shadow
-    target_domain = random.choice(TOP_DOMAINS[:10])  # Choose from top popular domains
+    target_domain = rng.choice(TOP_DOMAINS[:10])  # Choose from top popular domains
     num_events = config["num_events"]
+    events = [None] * num_events
     unique_subdomains = config["unique_subdomains"]
 
-    # Generate a large number of highly unique subdomains for same parent domain
-    for i in range(num_events):
-        timestamp = start_time + datetime.timedelta(
-            hours=random.randint(0, 8),
-            minutes=random.randint(0, 59),
-            seconds=random.randint(0, 59),
-        )
+    # Create unique random subdomain with high entropy for each query
+    suffixes = random_strings(
+        _LOWER_DIGITS, rng.choices(range(8, 16), k=num_events), rng
+    )
 
-        event = generate_normal_dns_event(host, timestamp)
+    # Generate a large number of highly unique subdomains for same parent domain
+    timestamps = sample_timestamps(start_time, 8, num_events, rng)
+    for i, (timestamp, suffix) in enumerate(zip(timestamps, suffixes)):
+        event = _make_event_skeleton(host, timestamp, rng)
 
-        # Create unique random subdomain with high entropy for each query
         subdomain_id = i % unique_subdomains
-        subdomain = f"x{subdomain_id}-" + "".join(
-            random.choice("abcdefghijklmnopqrstuvwxyz0123456789")
-            for _ in range(random.randint(8, 15))
-        )
-        event["query"] = f"{subdomain}.{target_domain}"
-        event["parent_domain"] = target_domain
-        event["subdomain"] = subdomain
-
-        # Usually A records pointing to malicious IPs
-        event["record_type"] = "A"
+        subdomain = f"x{subdomain_id}-{suffix}"
+        query = f"{subdomain}.{target_domain}"
 
         # Shadow domains often resolve to suspicious IPs
-        if event["reply_code"] == "NOERROR":
+        reply_code = sample_reply_code(rng)
+        answer = None
+        if reply_code == "NOERROR":
             # Generate suspicious-looking IPs
-            suspicious_ranges = ["185.220.", "45.95.", "91.219.", "103.15."]
-            suspicious_prefix = random.choice(suspicious_ranges)
-            event["answer"] = (
-                f"{suspicious_prefix}{random.randint(0, 255)}.{random.randint(1, 255)}"
-            )
+            suspicious_prefix = rng.choice(_SUSPICIOUS_PREFIXES)
+            answer = f"{suspicious_prefix}{rng.randrange(256)}.{rng.randrange(1, 256)}"
+
+        # Usually A records pointing to malicious IPs
+        _complete_event(event, query, "A", reply_code, answer)
 
         # Add anomaly type and metadata
         event["anomaly_type"] = "DOMAIN_SHADOWING"
-        event["anomaly_description"] = config["description"]
-        events.append(event)
+        event["anomaly_description"] = description
+        events[i] = event
 
     return events
 
 
 # 9. Behavioral Clustering - Similar abnormal DNS behavior across hosts
-def generate_behavioral_cluster(base_hosts, start_time):
+def generate_behavioral_cluster(base_hosts, start_time, rng):
     """
     Create a group of hosts with similar abnormal DNS behavior
     This helps demonstrate behavioral clustering for anomaly detection
     Designed to trigger: dns_behavioral_clustering_detection in Splunk
     """
-    all_events = []
     config = ANOMALY_CONFIG["BEHAVIORAL_CLUSTER"]
+    description = config["description"]
     cluster_size = min(config["cluster_size"], len(base_hosts))
 
     # Select hosts for this cluster
-    cluster_hosts = random.sample(base_hosts, cluster_size)
+    cluster_hosts = rng.sample(base_hosts, cluster_size)
 
     # Define a consistent pattern for this botnet-like activity
-    cluster_domain = random.choice(MALICIOUS_DOMAINS)
-    cluster_record_type = random.choice(["A", "TXT"])
-    query_interval = random.randint(15, 25)  # minutes
+    cluster_domain = rng.choice(MALICIOUS_DOMAINS)
+    cluster_record_type = rng.choice(["A", "TXT"])
+    query_interval = rng.randint(15, 25)  # minutes
     events_per_host = config["events_per_host"]
+    all_events = [None] * (cluster_size * events_per_host)
 
     # Create consistent beacon-like pattern across multiple hosts
-    for host in cluster_hosts:
-        for i in range(events_per_host):
-            # Similar timing with slight variations
-            timestamp = start_time + datetime.timedelta(
-                minutes=i * query_interval + random.uniform(-1, 1)
+    for host_index, host in enumerate(cluster_hosts):
+        first_event = host_index * events_per_host
+        # Encoded command payloads for this host's TXT queries
+        if cluster_record_type == "TXT":
+            payloads = random_strings(
+                _B64_ALPHABET,
+                rng.choices(range(20, 31), k=events_per_host),
+                rng,
             )
 
-            event = generate_normal_dns_event(host, timestamp)
+        # Similar timing with slight variations, drawn for all events at once
+        timestamps = [
+            format_event_time(
+                start_time, (i * query_interval + rng.uniform(-1, 1)) * 60
+            )
+            for i in range(events_per_host)
+        ]
+
+        # All hosts query similar pattern of domains
+        queries = [
+            f"node{i % 5}-{node_id}.{cluster_domain}"
+            for i, node_id in enumerate(
+                rng.choices(range(100, 1000), k=events_per_host)
+            )
+        ]
 
-            # All hosts query similar pattern of domains
-            subdomain = f"node{i % 5}-{random.randint(100, 999)}"
-            event["query"] = f"{subdomain}.{cluster_domain}"
-            event["record_type"] = cluster_record_type
+        for i, (timestamp, query) in enumerate(zip(timestamps, queries)):
+            event = _make_event_skeleton(host, timestamp, rng)
+            reply_code = sample_reply_code(rng)
 
             # Consistent pattern in answers
-            if event["record_type"] == "A" and event["reply_code"] == "NOERROR":
+            answer = None
+            if cluster_record_type == "A" and reply_code == "NOERROR":
                 # Similar C2 IP patterns
-                event["answer"] = (
-                    f"45.95.{random.randint(1, 5)}.{random.randint(10, 200)}"
-                )
+                answer = f"45.95.{rng.randint(1, 5)}.{rng.randint(10, 200)}"
 
-            if event["record_type"] == "TXT":
+            txt_content = None
+            if cluster_record_type == "TXT":
                 # Encoded command pattern unique to this cluster
                 prefix = "cmd="
-                data_length = random.randint(20, 30)
-                payload = "".join(
-                    random.choice(
-                        "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789+/="
-                    )
-                    for _ in range(data_length)
-                )
-                event["answer"] = f'"{prefix}{payload}"'
-                event["txt_content"] = f"{prefix}{payload}"
+                txt_content = f"{prefix}{payloads[i]}"
+                answer = f'"{txt_content}"'
+
+            _complete_event(event, query, cluster_record_type, reply_code, answer)
+            if txt_content is not None:
+                event["txt_content"] = txt_content
 
             # Add anomaly type and metadata
             event["anomaly_type"] = "BEHAVIORAL_CLUSTER"
-            event["anomaly_description"] = config["description"]
+            event["anomaly_description"] = description
             event["cluster_id"] = 1  # All part of same cluster
-            all_events.append(event)
+            all_events[first_event + i] = event
 
     return all_events
 
 
-# Helper function to generate normal baseline activity for all hosts with realistic patterns
-def generate_baseline_activity(hosts, start_time, end_time, max_events):
+# Plan how many normal DNS queries every host makes in every hour
+def plan_baseline_activity(hosts, start_time, end_time, max_events, host_rngs):
     """
-    Generate baseline normal DNS activity for all hosts for the entire time period
-    with realistic daily and weekly patterns
+    Decide the baseline query count for each hour and host, following
+    realistic daily and weekly patterns, capped at max_events
+    Returns hour-major counts for generate_baseline_activity and the
+    total number of events planned for each host
     """
-    events = []
-    total_events = 0
-
     # Calculate the total duration in hours
     duration_hours = int((end_time - start_time).total_seconds() / 3600)
 
@@ -1447,66 +1693,311 @@ def generate_baseline_activity(hosts, start_time, end_time, max_events):
         f"Generating baseline activity for {len(hosts)} hosts over {duration_hours} hours..."
     )
 
-    # Track number of events per host for reporting
-    host_event_counts = defaultdict(int)
-
-    # For each hour in the time period
-    for hour_offset in range(duration_hours):
-        current_hour = start_time + datetime.timedelta(hours=hour_offset)
-        hour_of_day = current_hour.hour
-        is_weekend = current_hour.weekday() >= 5  # 5=Saturday, 6=Sunday
+    # Start and activity multiplier of every hour, based on hour and day type
+    # (weekday() 5=Saturday, 6=Sunday)
+    hour_starts = [
+        start_time + datetime.timedelta(hours=hour_offset)
+        for hour_offset in range(duration_hours)
+    ]
+    multipliers = [
+        WEEKEND_HOURS[hour.hour] if hour.weekday() >= 5 else WORKDAY_HOURS[hour.hour]
+        for hour in hour_starts
+    ]
 
-        # Get the appropriate activity multiplier based on hour and day type
-        if is_weekend:
-            activity_multiplier = WEEKEND_HOURS[hour_of_day]
+    # Number of queries for every host in every hour
+    host_counts = []
+    for host in hosts:
+        rng = host_rngs[host["host_id"]]
+        query_rate = host["query_rate"]
+
+        # Servers have more consistent activity patterns (less affected by business hours)
+        if host["department"] == "Servers":
+            host_counts.append(
+                [
+                    max(1, int(query_rate * (m * 0.5 + 0.5) * rng.uniform(0.8, 1.2)))
+                    for m in multipliers  # Minimum 50% activity for servers
+                ]
+            )
         else:
-            activity_multiplier = WORKDAY_HOURS[hour_of_day]
+            host_counts.append(
+                [
+                    max(1, int(query_rate * m * rng.uniform(0.7, 1.3)))
+                    for m in multipliers
+                ]
+            )
+    hourly_counts = [list(counts) for counts in zip(*host_counts)]
+
+    # Keep events in hour order until the maximum events limit is reached:
+    # the running total locates the host-hour cell that crosses the limit,
+    # which is trimmed, and everything after it is dropped
+    running_totals = list(
+        itertools.accumulate(itertools.chain.from_iterable(hourly_counts))
+    )
+    if running_totals and running_totals[-1] > max_events:
+        cutoff = bisect.bisect_left(running_totals, max_events)
+        hour_offset, host_index = divmod(cutoff, len(hosts))
+        del hourly_counts[hour_offset + 1 :]
+        last_hour = hourly_counts[hour_offset]
+        last_hour[host_index] -= running_totals[cutoff] - max_events
+        last_hour[host_index + 1 :] = [0] * (len(hosts) - host_index - 1)
+        print(f"Reached maximum events limit ({max_events})")
+    else:
+        print(
+            f"Generated {running_totals[-1] if running_totals else 0} baseline events"
+        )
+
+    # Track number of events per host for reporting (0 when no hours are planned)
+    host_event_counts = {
+        host["hostname"]: sum(counts[i] for counts in hourly_counts)
+        for i, host in enumerate(hosts)
+    }
+    return hourly_counts, host_event_counts
+
+
+# Baseline events are built column-wise, one list per sampled field, in the
+# order of _sample_client_columns followed by _sample_normal_queries
+# Event times are whole seconds after the start of the period
+BASELINE_COLUMNS = (
+    "host",
+    "time_offset",
+    "dest",
+    "app",
+    "user",
+    "response_time",
+    "transport",
+    "query",
+    "record_type",
+    "reply_code",
+    "answer",
+)
+
+
+# Helper function to generate normal baseline activity for all hosts with realistic patterns
+def generate_baseline_activity(hosts, hourly_counts, start_time, host_rngs):
+    """
+    Yield baseline normal DNS events hour by hour in timestamp order
+    Every event falls inside its own hour, so sorting each hour on the
+    integer time offsets orders the whole stream; only the current hour's
+    columns are held in memory while the events are written out
+    """
+    # Per-host values resolved once instead of looked up for every event
+    host_profiles = [
+        (host, host_rngs[host["host_id"]], host["department"] == "Servers")
+        for host in hosts
+    ]
+
+    for hour_offset, counts in enumerate(hourly_counts):
+        hour_seconds = hour_offset * 3600
+        num_events = sum(counts)
+        columns = [[None] * num_events for _ in BASELINE_COLUMNS]
+        index = 0
 
         # For each host, generate normal queries for this hour
-        for host in hosts:
-            # Servers have more consistent activity patterns (less affected by business hours)
-            if host["department"] == "Servers":
-                server_multiplier = (
-                    activity_multiplier * 0.5 + 0.5
-                )  # Minimum 50% activity for servers
-                queries_this_hour = max(
-                    1,
-                    int(
-                        host["query_rate"]
-                        * server_multiplier
-                        * random.uniform(0.8, 1.2)
-                    ),
-                )
-            else:
-                queries_this_hour = max(
-                    1,
-                    int(
-                        host["query_rate"]
-                        * activity_multiplier
-                        * random.uniform(0.7, 1.3)
-                    ),
-                )
+        for (host, rng, is_server), count in zip(host_profiles, counts):
+            # Random times within this hour, then every field in bulk
+            batch = (
+                [host] * count,
+                rng.choices(range(hour_seconds, hour_seconds + 3600), k=count),
+                *_sample_client_columns(host, rng, count),
+                *_sample_normal_queries(is_server, rng, count),
+            )
+            for column, values in zip(columns, batch):
+                column[index : index + count] = values
+            index += count
+
+        (
+            event_hosts,
+            time_offsets,
+            dests,
+            apps,
+            users,
+            response_times,
+            transports,
+            queries,
+            record_types,
+            reply_codes,
+            answers,
+        ) = columns
+
+        order = sorted(range(num_events), key=time_offsets.__getitem__)
+        timestamps = format_event_times(start_time, [time_offsets[i] for i in order])
+
+        for i, timestamp in zip(order, timestamps):
+            event = _event_fields(
+                event_hosts[i],
+                timestamp,
+                dests[i],
+                apps[i],
+                users[i],
+                response_times[i],
+                transports[i],
+            )
+            yield _complete_event(
+                event, queries[i], record_types[i], reply_codes[i], answers[i]
+            )
 
-            # Generate events for this host for this hour
-            for _ in range(queries_this_hour):
-                # Check if we've reached the maximum events limit
-                if total_events >= max_events:
-                    print(f"Reached maximum events limit ({max_events})")
-                    return events, host_event_counts
 
-                # Random time within this hour
-                event_time = current_hour + datetime.timedelta(
-                    minutes=random.randint(0, 59), seconds=random.randint(0, 59)
-                )
+# Run one anomaly generator in a worker process
+def _run_anomaly_job(job):
+    """
+    Generate one host's anomaly events and point every malicious query, and
+    any answer built from the same domain, at the domain assigned to that host
+    Each job carries its own seed, so results do not depend on which
+    worker runs it or in what order
+    """
+    generator_func, host, anomaly_time, seed, malicious_domain = job
+    anomaly_events = generator_func(host, anomaly_time, random.Random(seed))
+
+    # Update all events to use the assigned malicious domain
+    for event in anomaly_events:
+        if "query" in event and any(
+            domain in event["query"] for domain in MALICIOUS_DOMAINS
+        ):
+            # Replace any existing malicious domain with the assigned one
+            answer = event.get("answer")
+            for domain in MALICIOUS_DOMAINS:
+                if domain in event["query"]:
+                    event["query"] = event["query"].replace(domain, malicious_domain)
+                    if isinstance(answer, str):
+                        answer = answer.replace(domain, malicious_domain)
+            event["answer"] = answer
+            event["parent_domain"], event["subdomain"] = split_query(event["query"])
+
+    return anomaly_events
+
+
+# Write events as JSON lines, the format Splunk ingests with sourcetype _json
+def write_json_events(events, path):
+    """
+    Serialize with orjson when it is installed (C encoder producing bytes),
+    otherwise with the stdlib json module
+    Lines go through a 1 MiB buffer so the file sees few large writes; the
+    stdlib fallback joins 10,000 lines per write instead of concatenating a
+    newline onto every event
+    """
+    try:
+        import orjson
+    except ImportError:
+        # Compact UTF-8 output, byte-identical to the orjson path below
+        encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+        events = iter(events)
+        with open(path, "w", encoding="utf-8", buffering=1 << 20) as f:
+            while True:
+                chunk = list(map(encode, itertools.islice(events, 10000)))
+                if not chunk:
+                    break
+                f.write("\n".join(chunk))
+                f.write("\n")
+        return
+
+    with open(path, "wb", buffering=1 << 20) as f:
+        f.writelines(
+            orjson.dumps(event, option=orjson.OPT_APPEND_NEWLINE) for event in events
+        )
+
 
-                # Create the normal DNS event
-                event = generate_normal_dns_event(host, event_time)
-                events.append(event)
-                host_event_counts[host["hostname"]] += 1
-                total_events += 1
+# Low-cardinality fields held as Arrow dictionary arrays (codes + unique values)
+_PARQUET_DICTIONARY_FIELDS = (
+    "host",
+    "src",
+    "src_host",
+    "dest",
+    "app",
+    "transport",
+    "vendor_product",
+    "department",
+    "record_type",
+    "query_type",
+    "reply_code",
+    "action",
+    "parent_domain",
+    "anomaly_type",
+    "anomaly_description",
+    "date",
+)
+
+
+# Write events as a Parquet dataset for columnar analysis tools
+def write_parquet_dataset(events, root_path, sample_events):
+    """
+    Write events as a Parquet dataset partitioned by anomaly type and day
+    so readers such as pandas or DuckDB can skip whole partitions
+    zstd compression plus dictionary encoding keeps the repeated record
+    types, reply codes, hosts and domains small on disk
+    Events are converted PARQUET_BATCH_SIZE at a time; the first batch plus
+    sample_events (which carry the anomaly-only fields) fix the schema
+    A previous dataset at root_path is removed first, since a rerun covers
+    other days and would otherwise leave stale partitions behind; a
+    directory holding anything besides anomaly_type= partitions is left
+    untouched and the run stops
+    pyarrow is only needed, and only imported, when this output is selected
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+    except ImportError:
+        raise SystemExit("Parquet output requires pyarrow (pip install pyarrow)")
+
+    # Build an Arrow record batch from a list of events
+    def to_record_batch(batch, field_names, schema=None):
+        columns = {name: [event.get(name) for event in batch] for name in field_names}
+
+        # Partition columns: normal traffic has no anomaly type of its own
+        columns["anomaly_type"] = [
+            event.get("anomaly_type", "NORMAL") for event in batch
+        ]
+        columns["date"] = [event["timestamp"][:10] for event in batch]
+
+        for name in _PARQUET_DICTIONARY_FIELDS:
+            if name in columns:
+                columns[name] = pa.array(
+                    columns[name], type=pa.string()
+                ).dictionary_encode()
+        return pa.RecordBatch.from_pydict(columns, schema=schema)
+
+    events = iter(events)
+    batches = iter(lambda: list(itertools.islice(events, PARQUET_BATCH_SIZE)), [])
+    first_batch = next(batches, [])
+
+    # Anomaly events carry extra fields, so collect the union of all keys
+    sample = first_batch + list(sample_events)
+    field_names = list(dict.fromkeys(key for event in sample for key in event))
+    schema = pa.schema(
+        # Fields that are empty in the sample default to strings
+        field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+        for field in to_record_batch(sample, field_names).schema
+    )
 
-    print(f"Generated {total_events} baseline events")
-    return events, host_event_counts
+    if os.path.lexists(root_path):
+        if not os.path.isdir(root_path) or os.path.islink(root_path):
+            raise SystemExit(f"{root_path} exists and is not a dataset directory")
+        foreign = [
+            name
+            for name in os.listdir(root_path)
+            if not name.startswith("anomaly_type=")
+            or not os.path.isdir(os.path.join(root_path, name))
+        ]
+        if foreign:
+            raise SystemExit(
+                f"Refusing to replace {root_path}: it holds files this script "
+                f"did not write ({', '.join(sorted(foreign)[:3])})"
+            )
+        shutil.rmtree(root_path)
+    ds.write_dataset(
+        (
+            to_record_batch(batch, field_names, schema)
+            for batch in itertools.chain([first_batch], batches)
+        ),
+        root_path,
+        schema=schema,
+        format="parquet",
+        partitioning=["anomaly_type", "date"],
+        partitioning_flavor="hive",
+        file_options=ds.ParquetFileFormat().make_write_options(
+            compression="zstd", use_dictionary=True
+        ),
+        existing_data_behavior="error",
+    )
 
 
 def main():
@@ -1515,8 +2006,15 @@ def main():
     )
     print(f"Optimized for clear detection by Splunk DNSGuard AI macros")
 
+    # Seed the run-level generator and one independent generator per host
+    rng = random.Random(RANDOM_SEED)
+
     # Generate the internal hosts
-    internal_hosts = generate_internal_hosts()
+    internal_hosts = generate_internal_hosts(rng)
+    host_rngs = [
+        random.Random(seed) for seed in spawn_seeds(RANDOM_SEED, len(internal_hosts))
+    ]
+    host_by_name = {host["hostname"]: host for host in internal_hosts}
     print(
         f"Generated {len(internal_hosts)} hosts across {len(DEPARTMENTS)} departments"
     )
@@ -1525,7 +2023,7 @@ def main():
     end_time = datetime.datetime.now()
     start_time = end_time - datetime.timedelta(days=TIME_PERIOD_DAYS)
 
-    # Create a list to store all events
+    # Create a list to store all anomaly events (baseline events are streamed)
     all_events = []
 
     # Define anomaly types mapping to generator functions
@@ -1552,15 +2050,20 @@ def main():
         "steal-credentials.net": "TXT_RECORD_ANOMALY",
     }
 
+    # Invert the mapping once so each anomaly finds its domains directly
+    domains_by_anomaly = defaultdict(list)
+    for domain, anomaly in malicious_domain_anomalies.items():
+        domains_by_anomaly[anomaly].append(domain)
+
     # Set aside about 75% of the events for baseline
     baseline_max_events = int(MAX_EVENTS * 0.75)
 
     # Generate baseline normal activity for all hosts
     print("Generating baseline normal DNS activity...")
-    baseline_events, host_event_counts = generate_baseline_activity(
-        internal_hosts, start_time, end_time, baseline_max_events
+    hourly_counts, host_event_counts = plan_baseline_activity(
+        internal_hosts, start_time, end_time, baseline_max_events, host_rngs
     )
-    all_events.extend(baseline_events)
+    baseline_count = sum(host_event_counts.values())
 
     # Select exactly 10 hosts for anomalies (with preference for high-activity hosts)
     anomaly_hosts = sorted(
@@ -1601,9 +2104,11 @@ def main():
     # First pass - handle all regular anomalies
     # Keep track of malicious domains used by each host
     host_malicious_domains = {}
+    anomaly_jobs = []
+    anomaly_job_labels = []
 
     for hostname, anomaly_types in host_anomaly_map.items():
-        host = next(h for h in internal_hosts if h["hostname"] == hostname)
+        host = host_by_name[hostname]
 
         for anomaly_type in anomaly_types:
             if anomaly_type == "BEHAVIORAL_CLUSTER":
@@ -1612,7 +2117,7 @@ def main():
                 continue
 
             # Generate random time for this anomaly (weekdays during business hours)
-            random_day = random.randint(
+            random_day = rng.randint(
                 1, TIME_PERIOD_DAYS - 3
             )  # Avoid very start and end
             anomaly_time = start_time + datetime.timedelta(days=random_day)
@@ -1623,38 +2128,36 @@ def main():
 
             # Set business hours (9am-6pm)
             anomaly_time = anomaly_time.replace(
-                hour=random.randint(9, 18), minute=random.randint(0, 59)  # 9am-6pm
+                hour=rng.randint(9, 18), minute=rng.randint(0, 59)  # 9am-6pm
             )
 
             # Select a malicious domain for this host based on the anomaly type
             # Find a domain that matches this anomaly type
-            matching_domains = [
-                domain
-                for domain, anomaly in malicious_domain_anomalies.items()
-                if anomaly == anomaly_type
-            ]
+            matching_domains = domains_by_anomaly[anomaly_type]
             if matching_domains:
-                host_malicious_domains[hostname] = random.choice(matching_domains)
+                host_malicious_domains[hostname] = rng.choice(matching_domains)
             else:
                 # If no domain matches this anomaly type, use a random one
-                host_malicious_domains[hostname] = random.choice(MALICIOUS_DOMAINS)
-
-            # Generate the anomaly
-            generator_func = anomaly_generators[anomaly_type]
-            anomaly_events = generator_func(host, anomaly_time)
-
-            # Update all events to use the assigned malicious domain
-            for event in anomaly_events:
-                if "query" in event and any(
-                    domain in event["query"] for domain in MALICIOUS_DOMAINS
-                ):
-                    # Replace any existing malicious domain with the assigned one
-                    for domain in MALICIOUS_DOMAINS:
-                        if domain in event["query"]:
-                            event["query"] = event["query"].replace(
-                                domain, host_malicious_domains[hostname]
-                            )
+                host_malicious_domains[hostname] = rng.choice(MALICIOUS_DOMAINS)
 
+            # Queue the anomaly; generators are independent of each other and
+            # get their own seed, as the host's generator feeds its baseline
+            anomaly_jobs.append(
+                (
+                    anomaly_generators[anomaly_type],
+                    host,
+                    anomaly_time,
+                    rng.getrandbits(64),
+                    host_malicious_domains[hostname],
+                )
+            )
+            anomaly_job_labels.append((anomaly_type, hostname))
+
+    # Generate the queued anomalies in parallel, reporting them in queue order
+    with ProcessPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        for (anomaly_type, hostname), anomaly_events in zip(
+            anomaly_job_labels, executor.map(_run_anomaly_job, anomaly_jobs)
+        ):
             all_events.extend(anomaly_events)
             print(
                 f"  Generated {len(anomaly_events)} events for {anomaly_type} on host {hostname} using domain {host_malicious_domains[hostname]}"
@@ -1664,10 +2167,10 @@ def main():
     if behavioral_hosts:
         print("\nGenerating behavioral cluster across multiple hosts...")
         # Use a common time for the cluster
-        cluster_day = random.randint(5, TIME_PERIOD_DAYS - 5)
+        cluster_day = rng.randint(5, TIME_PERIOD_DAYS - 5)
         cluster_time = start_time + datetime.timedelta(days=cluster_day)
         cluster_time = cluster_time.replace(
-            hour=random.randint(10, 14), minute=random.randint(0, 30)
+            hour=rng.randint(10, 14), minute=rng.randint(0, 30)
         )
 
         # Get all hosts if we need more for the cluster
@@ -1680,22 +2183,37 @@ def main():
                 ]
             )
 
-        cluster_events = generate_behavioral_cluster(behavioral_hosts, cluster_time)
+        cluster_events = generate_behavioral_cluster(
+            behavioral_hosts, cluster_time, rng
+        )
         all_events.extend(cluster_events)
 
         print(
             f"  Generated {len(cluster_events)} events for behavioral cluster across {len(behavioral_hosts)} hosts"
         )
 
-    # Sort all events by timestamp
+    # Sort all events by timestamp: the anomalies here, while the baseline is
+    # generated in order and merged in during writing
     print("\nSorting events by timestamp...")
-    all_events.sort(key=lambda x: x["timestamp"])
+    all_events.sort(key=itemgetter("timestamp"))
+    total_events = baseline_count + len(all_events)
+    sorted_events = heapq.merge(
+        generate_baseline_activity(
+            internal_hosts, hourly_counts, start_time, host_rngs
+        ),
+        all_events,
+        key=itemgetter("timestamp"),
+    )
 
-    # Write events to file in JSON format
-    print(f"Writing {len(all_events)} events to {OUTPUT_FILE}...")
-    with open(OUTPUT_FILE, "w") as f:
-        for event in all_events:
-            f.write(json.dumps(event) + "\n")
+    # Write events in the configured output format
+    if OUTPUT_FORMAT == "parquet":
+        output_path = PARQUET_DATASET_DIR
+        print(f"Writing {total_events} events to {output_path}/...")
+        write_parquet_dataset(sorted_events, output_path, all_events)
+    else:
+        output_path = OUTPUT_FILE
+        print(f"Writing {total_events} events to {output_path}...")
+        write_json_events(sorted_events, output_path)
 
     # Create a summary file with details about the anomalies
     print("Creating summary report...")
@@ -1709,39 +2227,27 @@ def main():
         f.write(
             "====================================================================\n\n"
         )
-        f.write(f"Total DNS events generated: {len(all_events)}\n")
+        f.write(f"Total DNS events generated: {total_events}\n")
         f.write(
             f"Time range: {start_time.strftime('%Y-%m-%d %H:%M:%S')} to {end_time.strftime('%Y-%m-%d %H:%M:%S')}\n\n"
         )
 
-        # Count events by anomaly type
-        anomaly_counts = defaultdict(int)
-        normal_count = 0
-
-        for event in all_events:
-            if "anomaly_type" in event:
-                anomaly_counts[event["anomaly_type"]] += 1
-            else:
-                normal_count += 1
+        # Count events by anomaly type in one pass (all_events only holds
+        # anomalies; the baseline count is known from its plan)
+        anomaly_counts = Counter(event["anomaly_type"] for event in all_events)
+        normal_count = baseline_count
 
         f.write("EVENT COUNTS BY TYPE:\n")
         f.write(f"- Normal DNS events: {normal_count}\n")
         for anomaly_type, count in sorted(anomaly_counts.items()):
-            anomaly_description = next(
-                (
-                    event["anomaly_description"]
-                    for event in all_events
-                    if "anomaly_type" in event and event["anomaly_type"] == anomaly_type
-                ),
-                "",
+            anomaly_description = ANOMALY_CONFIG.get(anomaly_type, {}).get(
+                "description", ""
             )
             f.write(f"- {anomaly_type}: {count} events - {anomaly_description}\n")
 
         f.write("\nANOMALOUS HOSTS AND THEIR MALICIOUS DOMAINS:\n")
         for hostname, anomaly_types in host_anomaly_map.items():
-            host_info = next(
-                (h for h in internal_hosts if h["hostname"] == hostname), None
-            )
+            host_info = host_by_name.get(hostname)
             if host_info:
                 anomalies_str = ", ".join(anomaly_types)
                 malicious_domain = host_malicious_domains.get(hostname, "N/A")
@@ -1829,7 +2335,7 @@ def main():
             "====================================================================\n"
         )
 
-    print(f"Generated {len(all_events)} DNS events and saved to {OUTPUT_FILE}")
+    print(f"Generated {total_events} DNS events and saved to {output_path}")
     print(f"Summary saved to dns_events_summary.txt")
 
 